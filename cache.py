@@ -0,0 +1,112 @@
+"""Local caches for model responses and generated audio shared by the Raycast script commands."""
+
+import hashlib
+import os
+import shutil
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+
+CACHE_PATH = Path.home() / ".cache" / "raycast-polish" / "cache.db"
+# Least recently used entries beyond this are evicted
+MAX_ENTRIES = 500
+# Entries unused for this many seconds are treated as missing
+MAX_AGE = 7 * 24 * 60 * 60
+
+AUDIO_CACHE_DIR = Path.home() / ".cache" / "raycast-tts"
+# Least recently used audio files beyond this total size are evicted
+MAX_AUDIO_CACHE_BYTES = 500 * 1024 * 1024
+
+
+def cache_key(*parts):
+    """Hash the parts that determine a response into a cache key."""
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+def connect(create=False):
+    """Open the cache database, creating its directory only when writing."""
+    if create:
+        # The cache holds clipboard text, so only the user may read it
+        CACHE_PATH.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    connection = sqlite3.connect(CACHE_PATH)
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS responses "
+        "(key TEXT PRIMARY KEY, response TEXT NOT NULL, ts REAL NOT NULL)"
+    )
+    return connection
+
+
+def get_cached(key):
+    """Return the cached response for the key and mark it as recently used."""
+    try:
+        with closing(connect()) as connection, connection:
+            row = connection.execute(
+                "SELECT response FROM responses WHERE key = ? AND ts > ?",
+                (key, time.time() - MAX_AGE),
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                "UPDATE responses SET ts = ? WHERE key = ?", (time.time(), key)
+            )
+            return row[0]
+    except (OSError, sqlite3.Error):
+        # A broken cache only costs a model call
+        return None
+
+
+def set_cached(key, response):
+    """Store a response, evicting expired and least recently used entries."""
+    try:
+        with closing(connect(create=True)) as connection, connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                (key, response, time.time()),
+            )
+            connection.execute(
+                "DELETE FROM responses WHERE ts <= ?", (time.time() - MAX_AGE,)
+            )
+            connection.execute(
+                "DELETE FROM responses WHERE key NOT IN "
+                "(SELECT key FROM responses ORDER BY ts DESC LIMIT ?)",
+                (MAX_ENTRIES,),
+            )
+    except (OSError, sqlite3.Error):
+        pass
+
+
+def get_cached_audio(key, suffix):
+    """Return the path of the cached audio file for the key and mark it as recently used."""
+    path = AUDIO_CACHE_DIR / f"{key}{suffix}"
+    try:
+        # The modification time doubles as the last use for eviction
+        os.utime(path)
+    except OSError:
+        return None
+    return path
+
+
+def set_cached_audio(key, suffix, source_path):
+    """Copy an audio file into the cache, evicting the least recently used files."""
+    try:
+        AUDIO_CACHE_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+        path = AUDIO_CACHE_DIR / f"{key}{suffix}"
+        # Copy next to the target and swap it in, so no reader sees a partial file
+        temp_path = path.with_name(f"{path.name}.tmp")
+        shutil.copyfile(source_path, temp_path)
+        os.replace(temp_path, path)
+
+        entries = sorted(
+            (entry for entry in os.scandir(AUDIO_CACHE_DIR) if entry.is_file()),
+            key=lambda entry: entry.stat().st_mtime,
+            reverse=True,
+        )
+        total = 0
+        for entry in entries:
+            total += entry.stat().st_size
+            if total > MAX_AUDIO_CACHE_BYTES:
+                os.unlink(entry.path)
+    except OSError:
+        # The cache is only an optimization, never fail the script because of it
+        pass
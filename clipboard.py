@@ -0,0 +1,40 @@
+"""macOS clipboard helpers shared by the Raycast script commands."""
+
+import os
+
+from proc import run
+
+# pbcopy/pbpaste only treat the clipboard as UTF-8 with a UTF-8 locale
+CLIPBOARD_ENV = {**os.environ, "LANG": "en_US.UTF-8"}
+
+PBPASTE = "/usr/bin/pbpaste"
+PBCOPY = "/usr/bin/pbcopy"
+
+
+def pbpaste():
+    """Get text from the clipboard using pbpaste."""
+    result = run([PBPASTE], capture_output=True, check=True, env=CLIPBOARD_ENV)
+    # Empty clipboards are detected on the raw bytes, skipping the decode
+    if result.stdout.isspace():
+        return ""
+    return result.stdout.decode("utf-8", errors="replace")
+
+
+def pbcopy(text):
+    """Copy text to the clipboard using pbcopy."""
+    run([PBCOPY], input=text.encode("utf-8"), check=True, env=CLIPBOARD_ENV)
+
+
+# The clipboard backend, replace these to swap it
+_paste = pbpaste
+_copy = pbcopy
+
+
+def get_clipboard_text():
+    """Get text from the clipboard."""
+    return _paste()
+
+
+def copy_to_clipboard(text):
+    """Copy text to the clipboard."""
+    _copy(text)
@@ -0,0 +1,16 @@
+"""Environment loading shared by the Raycast script commands."""
+
+import os
+
+
+def ensure_env(*names):
+    """Load .env into the environment, unless it already provides all the given names.
+
+    python-dotenv is only imported when the file actually has to be read.
+    """
+    if names and all(name in os.environ for name in names):
+        return
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
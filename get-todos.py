@@ -10,48 +10,167 @@
 # @raycast.packageName Notes
 # @raycast.argument1 { "type": "text", "placeholder": "Path to notes folder" }
 
+import hashlib
+import json
 import os
 import sys
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Iterator, List, Optional
+from itertools import groupby
+from operator import attrgetter
 
 MARKDOWN_EXTENSION = ".md"
 TODO_IDENTIFIER = "* [ ]"
+TODO_IDENTIFIER_BYTES = TODO_IDENTIFIER.encode("utf-8")
 FILENAME_TODOS = f"open_todos{MARKDOWN_EXTENSION}"
+MAX_READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+# Above this many notes, parsing is CPU-bound enough to pay for worker processes
+PROCESS_POOL_THRESHOLD = 2000
+# Todos of unchanged notes are reused from here, keyed by (mtime, size)
+TODO_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "raycast-todos")
 
 
-@dataclass
+# Frozen and slotted, no per-instance __dict__ for the thousands of notes scanned
+@dataclass(frozen=True, slots=True)
 class TodosFromNote:
     folder: str
     filename: str
-    todos: list
+    todos: tuple[str, ...]
 
 
 def walk_through_notes(path: str) -> Iterator[str]:
-    for dirpath, _, filenames in os.walk(path):
-        for filename in filenames:
-            if filename.endswith(MARKDOWN_EXTENSION) and filename != FILENAME_TODOS:
-                yield os.path.join(dirpath, filename)
-
-
-def get_todos_from_note(note_path: str) -> Optional[TodosFromNote]:
+    # os.scandir exposes the entry type from readdir, so no extra stat() per entry
+    directories = [path]
+    while directories:
+        directory = directories.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append(entry.path)
+                    elif (
+                        entry.name.endswith(MARKDOWN_EXTENSION)
+                        and entry.name != FILENAME_TODOS
+                    ):
+                        yield entry.path
+        except OSError as e:
+            print(f"Error reading {directory}: {e}", file=sys.stderr)
+
+
+def find_todo_lines(data) -> list[str]:
+    # bytes.find is a C-level memmem, only the matching lines get decoded
+    todos = []
+    position = 0
+    while (hit := data.find(TODO_IDENTIFIER_BYTES, position)) != -1:
+        line_start = data.rfind(b"\n", 0, hit) + 1
+        line_end = data.find(b"\n", hit)
+        if line_end == -1:
+            line_end = len(data)
+        todos.append(data[line_start:line_end].decode("utf-8").strip())
+        position = line_end + 1
+    return todos
+
+
+def split_note_path(note_path: str) -> tuple[str, str]:
+    absolute_folder, filename = os.path.split(note_path)
+    # Notes of a folder share one folder string, which groupby compares by identity first
+    return sys.intern(os.path.split(absolute_folder)[1]), filename
+
+
+def get_todos_from_note(note_path: str) -> TodosFromNote | None:
     try:
-        absolute_folder, filename = os.path.split(note_path)
-        folder = os.path.split(absolute_folder)[1]
-        with open(note_path, "r", encoding="utf-8") as note_file:
-            lines = note_file.readlines()
-        if todos_in_file := [line.strip() for line in lines if TODO_IDENTIFIER in line]:
-            return TodosFromNote(folder=folder, filename=filename, todos=todos_in_file)
+        folder, filename = split_note_path(note_path)
+        # One read() of the whole note is cheaper than mapping a file this small
+        with open(note_path, "rb") as note_file:
+            note_data = note_file.read()
+        todos_in_file = find_todo_lines(note_data)
+        return TodosFromNote(
+            folder=folder, filename=filename, todos=tuple(todos_in_file)
+        )
     except (OSError, UnicodeDecodeError) as e:
         print(f"Error reading {note_path}: {e}", file=sys.stderr)
         return None
 
 
+def todo_cache_path(path: str) -> str:
+    # One cache file per notes folder
+    digest = hashlib.sha256(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(TODO_CACHE_DIR, f"{digest}.json")
+
+
+def load_todo_cache(cache_path: str) -> dict:
+    try:
+        with open(cache_path, "rb") as cache_file:
+            return json.load(cache_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_todo_cache(cache_path: str, cache: dict) -> None:
+    try:
+        os.makedirs(TODO_CACHE_DIR, mode=0o700, exist_ok=True)
+        # Write next to the cache and swap it in, so a crash never leaves half a file
+        temp_path = f"{cache_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as cache_file:
+            json.dump(cache, cache_file)
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        print(f"Error saving todo cache: {e}", file=sys.stderr)
+
+
+def scan_notes(note_paths: list[str]) -> list[TodosFromNote | None]:
+    if len(note_paths) > PROCESS_POOL_THRESHOLD:
+        # Very large vaults: scan in worker processes to sidestep the GIL
+        executor = ProcessPoolExecutor()
+        map_kwargs = {"chunksize": 64}
+    else:
+        # Reading notes is I/O-bound, so overlap the file reads on a thread pool
+        executor = ThreadPoolExecutor(max_workers=MAX_READ_WORKERS)
+        map_kwargs = {}
+
+    with executor:
+        return list(executor.map(get_todos_from_note, note_paths, **map_kwargs))
+
+
 def get_todos_from_path(path: str) -> list:
+    cache_path = todo_cache_path(path)
+    cache = load_todo_cache(cache_path)
+    note_paths = list(walk_through_notes(path))
+
+    # Only notes whose mtime or size changed since the last run are read again
+    updated_cache = {}
+    changed_notes = {}
+    for note_path in note_paths:
+        try:
+            note_stat = os.stat(note_path)
+        except OSError as e:
+            print(f"Error reading {note_path}: {e}", file=sys.stderr)
+            continue
+        signature = [note_stat.st_mtime_ns, note_stat.st_size]
+        cached = cache.get(note_path)
+        if cached and cached[:2] == signature:
+            updated_cache[note_path] = cached
+        else:
+            changed_notes[note_path] = signature
+
+    scanned = scan_notes(list(changed_notes))
+    for (note_path, signature), todos_from_one_note in zip(
+        changed_notes.items(), scanned
+    ):
+        # Notes that failed to read are not cached, so they are retried next run
+        if todos_from_one_note:
+            updated_cache[note_path] = [*signature, list(todos_from_one_note.todos)]
+
+    if updated_cache != cache:
+        save_todo_cache(cache_path, updated_cache)
+
     return [
-        todos_from_one_note
-        for note_path in walk_through_notes(path)
-        if (todos_from_one_note := get_todos_from_note(note_path))
+        TodosFromNote(
+            *split_note_path(note_path), todos=tuple(updated_cache[note_path][2])
+        )
+        for note_path in note_paths
+        if note_path in updated_cache and updated_cache[note_path][2]
     ]
 
 
@@ -59,26 +178,32 @@ def format_single_todo(line: str) -> str:
     return line.split("; folder: ")[0] + "\n"
 
 
-def format_todos(todos: List[TodosFromNote]) -> list:
-    folders = list({todo.folder for todo in todos})
+def format_todos(todos: list[TodosFromNote]) -> list:
+    # One sort, then a linear pass, and folders come out in a stable order
+    sorted_todos = sorted(todos, key=attrgetter("folder"))
+
     formatted_todos = []
-    for folder in folders:
-        formatted_todos.append(f"# {folder}\n")
-        files_in_folder = [todo for todo in todos if todo.folder == folder]
+    for folder, files_in_folder in groupby(sorted_todos, key=attrgetter("folder")):
+        sections = [f"# {folder}"]
         for todo_file in files_in_folder:
-            formatted_todos.append(f"## {todo_file.filename}\n")
-            formatted_todos.extend([todo + "\n" for todo in todo_file.todos])
-            formatted_todos.append("\n")
-        formatted_todos.append("\n")
+            sections.append(f"## {todo_file.filename}")
+            sections.extend(todo_file.todos)
+            sections.append("")
+        formatted_todos.append("\n".join(sections) + "\n\n")
     return formatted_todos
 
 
 def save_todos_in_one_file(path: str, todos: list) -> None:
     try:
         path_todo_file = os.path.join(path, FILENAME_TODOS)
-        formatted_todos = format_todos(todos)
-        with open(path_todo_file, "w", encoding="utf-8") as todo_file:
-            todo_file.writelines(formatted_todos)
+        # One pre-joined buffer and a single write() instead of one per todo line
+        buffer = "".join(format_todos(todos)).encode("utf-8")
+        # Write next to the todo file and swap it in, so it is never left half-written
+        temp_path = f"{path_todo_file}.tmp"
+        # A buffered file retries short writes, a bare os.write() could truncate it
+        with open(temp_path, "wb") as todo_file:
+            todo_file.write(buffer)
+        os.replace(temp_path, path_todo_file)
         print(f"✅ Saved {len(todos)} todo sections to {path_todo_file}")
     except OSError as e:
         print(f"❌ Error saving todos to {path}: {e}", file=sys.stderr)
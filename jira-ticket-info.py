@@ -13,79 +13,229 @@
 # @raycast.argument1 {"type": "text", "placeholder": "Enter JIRA ticket ID (e.g., PROJ-123)"}
 # @raycast.argument2 {"type": "dropdown", "placeholder": "Include AI summary?", "data": [{"title": "No summary", "value": "none"}, {"title": "Include AI summary", "value": "summary"}]}
 
+import asyncio
+import json
 import os
 import sys
 from datetime import datetime
-from jira import JIRA
-from openai import OpenAI
-from dotenv import load_dotenv
-import pyperclip
+from functools import lru_cache
+from pathlib import Path
 
+from clipboard import copy_to_clipboard
+from env import ensure_env
 
+CACHE_DIR = Path.home() / ".cache" / "raycast-jira"
+# Only the fields that end up in the output; comments are fetched separately
+JIRA_FIELDS = "summary,description,status,assignee,reporter,created,updated"
+COMMENT_LIMIT = 20
+COMMENT_PAGE_SIZE = 100
+JIRA_TIMEOUT = 10
+COMMENT_SEPARATOR = "-" * 50
+
+
+@lru_cache(maxsize=256)
 def format_datetime(dt_str):
     """Format JIRA datetime string to readable format."""
     try:
-        dt = datetime.strptime(dt_str, "%Y-%m-%dT%H:%M:%S.%f%z")
+        # JIRA sends e.g. "2024-01-02T03:04:05.678+0000", fromisoformat wants "+00:00"
+        iso_str = dt_str
+        if len(iso_str) > 5 and iso_str[-5] in "+-":
+            iso_str = f"{iso_str[:-2]}:{iso_str[-2:]}"
+        dt = datetime.fromisoformat(iso_str)
         return dt.strftime("%B %d, %Y at %I:%M %p")
-    except Exception:
+    except (TypeError, ValueError):
         return dt_str
 
 
-def get_ticket_info(jira_client, ticket_id):
+def cache_file_path(ticket_key, all_comments):
+    """Cache file of a ticket, with a separate entry for the --all-comments output."""
+    suffix = "-all-comments" if all_comments else ""
+    return CACHE_DIR / f"{ticket_key}{suffix}.json"
+
+
+def load_cache(ticket_key, all_comments):
+    """Load cached ticket information, or None if there is no usable cache entry."""
+    try:
+        cache_file = cache_file_path(ticket_key, all_comments)
+        return json.loads(cache_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def save_cache(ticket_key, updated, all_comments, ticket_info):
+    """Store ticket information together with the JIRA 'updated' timestamp."""
+    try:
+        CACHE_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+        cache_file = cache_file_path(ticket_key, all_comments)
+        cache_file.write_text(
+            json.dumps({"updated": updated, "ticket_info": ticket_info}),
+            encoding="utf-8",
+        )
+    except OSError:
+        # The cache is only an optimization, never fail the lookup because of it
+        pass
+
+
+def get_json(jira_client, path, params=None):
+    """GET a JIRA REST API path, raising JIRA's own error messages on failure."""
+    response = jira_client.get(f"/rest/api/2/{path}", params=params)
+    if response.is_error:
+        try:
+            messages = response.json().get("errorMessages")
+        except ValueError:
+            messages = None
+        detail = "; ".join(messages) if messages else response.reason_phrase
+        raise RuntimeError(f"JIRA returned {response.status_code}: {detail}")
+    return response.json()
+
+
+def get_comments(jira_client, ticket_key, all_comments=False):
+    """Fetch ticket comments oldest first, returning (comments, total count).
+
+    Unless all_comments is set, only the COMMENT_LIMIT most recent comments are
+    requested so hot tickets don't pull hundreds of comments.
+    """
+    path = f"issue/{ticket_key}/comment"
+
+    if not all_comments:
+        page = get_json(
+            jira_client,
+            path,
+            params={"orderBy": "-created", "maxResults": COMMENT_LIMIT},
+        )
+        # The server returns the newest comments first
+        return list(reversed(page["comments"])), page["total"]
+
+    comments = []
+    while True:
+        page = get_json(
+            jira_client,
+            path,
+            params={
+                "orderBy": "created",
+                "startAt": len(comments),
+                "maxResults": COMMENT_PAGE_SIZE,
+            },
+        )
+        comments.extend(page["comments"])
+        if not page["comments"] or len(comments) >= page["total"]:
+            return comments, page["total"]
+
+
+def get_ticket_info(jira_client, ticket_id, all_comments=False):
     """Fetch ticket information from JIRA."""
     try:
-        issue = jira_client.issue(ticket_id, expand="comments")
+        # Cheap probe: reuse the cached ticket if it has not been updated since
+        probe = get_json(jira_client, f"issue/{ticket_id}", {"fields": "updated"})
+        cached = load_cache(probe["key"], all_comments)
+        if cached and cached.get("updated") == probe["fields"]["updated"]:
+            return cached["ticket_info"]
+
+        issue = get_json(jira_client, f"issue/{ticket_id}", {"fields": JIRA_FIELDS})
+        fields = issue["fields"]
 
         ticket_info = {
-            "key": issue.key,
-            "title": issue.fields.summary,
-            "description": issue.fields.description or "No description provided",
-            "status": issue.fields.status.name,
-            "assignee": getattr(issue.fields.assignee, "displayName", "Unassigned"),
-            "reporter": getattr(issue.fields.reporter, "displayName", "Unknown"),
-            "created": format_datetime(issue.fields.created),
-            "updated": format_datetime(issue.fields.updated),
+            "key": issue["key"],
+            "title": fields["summary"],
+            "description": fields.get("description") or "No description provided",
+            "status": fields["status"]["name"],
+            "assignee": (fields.get("assignee") or {}).get("displayName", "Unassigned"),
+            "reporter": (fields.get("reporter") or {}).get("displayName", "Unknown"),
+            "created": format_datetime(fields["created"]),
+            "updated": format_datetime(fields["updated"]),
             "comments": [],
         }
 
-        # Get comments sorted chronologically
-        comments = sorted(issue.fields.comment.comments, key=lambda x: x.created)
+        # Comments come back from the server in chronological order
+        comments, ticket_info["comments_total"] = get_comments(
+            jira_client, issue["key"], all_comments
+        )
 
         for comment in comments:
+            first_name = comment["author"]["displayName"].split()[0]
             ticket_info["comments"].append(
                 {
-                    "author": comment.author.displayName.split()[0],  # First name only
-                    "created": format_datetime(comment.created),
-                    "body": comment.body,
+                    "author": first_name,
+                    "created": format_datetime(comment["created"]),
+                    "body": comment["body"],
                 }
             )
 
+        save_cache(issue["key"], fields["updated"], all_comments, ticket_info)
+
         return ticket_info
 
     except Exception as e:
         return None, str(e)
 
 
-def generate_summary(openai_client, ticket_info):
+def fetch_ticket_info(jira_server, jira_email, jira_token, ticket_id, all_comments):
+    """Connect to JIRA and fetch ticket information (blocking)."""
+    # Imported only after the credentials were validated
+    import httpx
+
+    # Plain REST calls instead of the jira SDK, which queries serverInfo up front.
+    # The probe, field and comment requests share one multiplexed HTTP/2
+    # connection, and connection failures are retried by the transport.
+    with httpx.Client(
+        base_url=jira_server,
+        auth=(jira_email, jira_token),
+        headers={"Accept": "application/json"},
+        timeout=JIRA_TIMEOUT,
+        transport=httpx.HTTPTransport(http2=True, retries=3),
+    ) as jira_client:
+        return get_ticket_info(jira_client, ticket_id, all_comments)
+
+
+def format_comments_heading(ticket_info):
+    """Comment count for the output heading, noting when older comments were skipped."""
+    shown = len(ticket_info["comments"])
+    total = ticket_info.get("comments_total", shown)
+    if total > shown:
+        return f"{shown} most recent of {total}, use --all-comments to show all"
+    return str(shown)
+
+
+async def create_openai_client(api_key):
+    """Create the OpenAI client in a worker thread, or None without an API key."""
+    if not api_key:
+        return None
+
+    def import_and_create():
+        from openai import AsyncOpenAI
+
+        return AsyncOpenAI(api_key=api_key)
+
+    return await asyncio.to_thread(import_and_create)
+
+
+async def generate_summary(openai_client, ticket_info):
     """Generate AI summary of the ticket and comments."""
     try:
-        # Prepare content for summarization
-        content = f"""
+        # Prepare content for summarization, with the number of comments actually sent
+        included = len(ticket_info["comments"])
+        total = ticket_info.get("comments_total", included)
+        comment_count = (
+            f"{included} most recent of {total}" if total > included else str(included)
+        )
+        content_parts = [
+            f"""
 Ticket: {ticket_info["title"]}
 Status: {ticket_info["status"]}
 Description: {ticket_info["description"]}
 
-Comments ({len(ticket_info["comments"])} total):
+Comments ({comment_count}):
 """
-
-        for comment in ticket_info["comments"]:
-            content += (
-                f"\n{comment['author']} ({comment['created']}): {comment['body']}\n"
-            )
+        ]
+        content_parts.extend(
+            f"\n{comment['author']} ({comment['created']}): {comment['body']}\n"
+            for comment in ticket_info["comments"]
+        )
+        content = "".join(content_parts)
 
         input_text = f"Please summarize this JIRA ticket and its comments. Provide a concise, structured summary that highlights the key points, current status, and main discussion topics from the comments:\n\n{content}"
 
-        response = openai_client.responses.create(
+        response = await openai_client.responses.create(
             model=os.environ.get("MODEL", "gpt-5-mini"),
             input=input_text,
             text={"verbosity": "low"},
@@ -97,15 +247,21 @@ Comments ({len(ticket_info["comments"])} total):
         return f"❌ Failed to generate summary: {str(e)}"
 
 
-def main():
-    load_dotenv()
-
+async def main():
     if len(sys.argv) < 3:
-        print("❌ Usage: jira-ticket-info.py <ticket-id> <include-summary>")
+        print(
+            "❌ Usage: jira-ticket-info.py <ticket-id> <include-summary> [--all-comments]"
+        )
         sys.exit(1)
 
     ticket_id = sys.argv[1].strip()
     include_summary = sys.argv[2].strip() == "summary"
+    all_comments = "--all-comments" in sys.argv[3:]
+
+    required_env = ["JIRA_SERVER", "JIRA_EMAIL", "JIRA_API_TOKEN"]
+    if include_summary:
+        required_env.append("OPENAI_API_KEY")
+    ensure_env(*required_env)
 
     # JIRA connection setup
     jira_server = os.environ.get("JIRA_SERVER")
@@ -125,11 +281,20 @@ def main():
     try:
         print(f"🔍 Fetching JIRA ticket: {ticket_id}")
 
-        # Connect to JIRA
-        jira_client = JIRA(server=jira_server, basic_auth=(jira_email, jira_token))
-
-        # Get ticket information
-        result = get_ticket_info(jira_client, ticket_id)
+        openai_api_key = os.environ.get("OPENAI_API_KEY") if include_summary else None
+
+        # Fetch the ticket while the OpenAI client is being set up
+        result, openai_client = await asyncio.gather(
+            asyncio.to_thread(
+                fetch_ticket_info,
+                jira_server,
+                jira_email,
+                jira_token,
+                ticket_id,
+                all_comments,
+            ),
+            create_openai_client(openai_api_key),
+        )
 
         if isinstance(result, tuple):
             ticket_info, error = result
@@ -138,83 +303,74 @@ def main():
 
         ticket_info = result
 
-        # Prepare formatted output for clipboard
-        output_text = f"🎫 {ticket_info['key']}: {ticket_info['title']}\n"
-        output_text += f"📊 Status: {ticket_info['status']}\n"
-        output_text += f"👤 Assignee: {ticket_info['assignee']}\n"
-        output_text += f"📝 Reporter: {ticket_info['reporter']}\n"
-        output_text += f"📅 Created: {ticket_info['created']}\n"
-        output_text += f"🔄 Updated: {ticket_info['updated']}\n\n"
+        # Schedule the summary now, it runs from the first await after the
+        # ticket has been printed
+        summary_task = None
+        if include_summary and openai_client:
+            summary_task = asyncio.create_task(
+                generate_summary(openai_client, ticket_info)
+            )
 
-        output_text += "📋 Description:\n"
-        output_text += f"{ticket_info['description']}\n\n"
+        # Build the output once, it is both printed and copied to the clipboard
+        parts = [
+            f"🎫 {ticket_info['key']}: {ticket_info['title']}",
+            f"📊 Status: {ticket_info['status']}",
+            f"👤 Assignee: {ticket_info['assignee']}",
+            f"📝 Reporter: {ticket_info['reporter']}",
+            f"📅 Created: {ticket_info['created']}",
+            f"🔄 Updated: {ticket_info['updated']}",
+            "",
+            "📋 Description:",
+            ticket_info["description"],
+            "",
+        ]
 
         # Add comments to output
         if ticket_info["comments"]:
-            output_text += f"💬 Comments ({len(ticket_info['comments'])}):\n"
-            output_text += "-" * 50 + "\n"
+            parts.append(f"💬 Comments ({format_comments_heading(ticket_info)}):")
+            parts.append(COMMENT_SEPARATOR)
 
             for comment in ticket_info["comments"]:
-                output_text += f"\n👤 {comment['author']} - {comment['created']}\n"
-                output_text += f"{comment['body']}\n"
-                output_text += "-" * 50 + "\n"
+                parts.append("")
+                parts.append(f"👤 {comment['author']} - {comment['created']}")
+                parts.append(comment["body"])
+                parts.append(COMMENT_SEPARATOR)
         else:
-            output_text += "💬 Comments: No comments found\n"
+            parts.append("💬 Comments: No comments found")
+
+        # Display the ticket information with a single write
+        sys.stdout.write("\n" + "\n".join(parts) + "\n")
+        sys.stdout.flush()
 
-        # Generate AI summary if requested
-        summary_text = ""
+        # Add the AI summary if requested
+        summary_parts = []
         if include_summary:
-            openai_api_key = os.environ.get("OPENAI_API_KEY")
-            if not openai_api_key:
-                summary_text = "\n❌ OpenAI API key not found. Cannot generate summary.\n💡 Set OPENAI_API_KEY environment variable to enable AI summaries."
+            summary_parts.append("")
+            if summary_task is None:
+                summary_parts.append(
+                    "❌ OpenAI API key not found. Cannot generate summary."
+                )
+                summary_parts.append(
+                    "💡 Set OPENAI_API_KEY environment variable to enable AI summaries."
+                )
             else:
-                print("🤖 Generating AI summary...")
+                print("🤖 Generating AI summary...", flush=True)
 
-                openai_client = OpenAI(api_key=openai_api_key)
-                summary = generate_summary(openai_client, ticket_info)
+                summary = await summary_task
 
-                summary_text = f"\n🤖 AI Summary:\n{summary}"
+                summary_parts.append("🤖 AI Summary:")
+                summary_parts.append(summary)
 
-        # Add summary to output if available
-        if summary_text:
-            output_text += summary_text
+        output_text = "\n".join(parts + summary_parts)
 
         # Copy formatted output to clipboard
-        pyperclip.copy(output_text)
-
-        # Display ticket information
-        print(f"\n🎫 **{ticket_info['key']}: {ticket_info['title']}**")
-        print(f"📊 Status: {ticket_info['status']}")
-        print(f"👤 Assignee: {ticket_info['assignee']}")
-        print(f"📝 Reporter: {ticket_info['reporter']}")
-        print(f"📅 Created: {ticket_info['created']}")
-        print(f"🔄 Updated: {ticket_info['updated']}")
-
-        print("\n📋 **Description:**")
-        print(ticket_info["description"])
-
-        # Display comments
-        if ticket_info["comments"]:
-            print(f"\n💬 **Comments ({len(ticket_info['comments'])}):**")
-            print("-" * 50)
+        copy_to_clipboard(output_text)
 
-            for comment in ticket_info["comments"]:
-                print(f"\n👤 **{comment['author']}** - {comment['created']}")
-                print(comment["body"])
-                print("-" * 50)
-        else:
-            print("\n💬 **Comments:** No comments found")
-
-        # Display AI summary if generated
-        if summary_text:
-            if "❌" in summary_text:
-                print(summary_text)
-            else:
-                print("\n🤖 **AI Summary:**")
-                print(summary.strip())
-
-        print(f"\n✅ Successfully retrieved information for {ticket_id}")
-        print("📋 Full ticket information copied to clipboard!")
+        sys.stdout.write(
+            "".join(f"{line}\n" for line in summary_parts) + "\n"
+            f"✅ Successfully retrieved information for {ticket_id}\n"
+            "📋 Full ticket information copied to clipboard!\n"
+        )
 
     except Exception as e:
         print(f"❌ Error: {str(e)}")
@@ -222,4 +378,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
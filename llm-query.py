@@ -18,14 +18,13 @@
 import os
 import subprocess
 import sys
-import pyperclip
-from dotenv import load_dotenv
 
+from clipboard import copy_to_clipboard
+from env import ensure_env
+from proc import run
 
-def main():
-    # Load environment variables
-    load_dotenv()
 
+def main():
     prompt = sys.argv[1] if len(sys.argv) > 1 else None
     model = sys.argv[2] if len(sys.argv) > 2 else None
 
@@ -33,6 +32,9 @@ def main():
         print("❌ Prompt is required")
         sys.exit(1)
 
+    # Load environment variables, the llm CLI inherits API keys from .env
+    ensure_env()
+
     # Get LLM path from environment or use default
     llm_path = os.getenv("LLM_PATH", "/Users/alex/.local/bin/llm")
 
@@ -44,11 +46,11 @@ def main():
         cmd.append(prompt)
 
         # Execute the llm command
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        result = run(cmd, capture_output=True, text=True, check=True)
 
         # Get the output and save to clipboard
         output = result.stdout.strip()
-        pyperclip.copy(output)
+        copy_to_clipboard(output)
 
         # Output the result
         print(output)
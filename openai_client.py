@@ -0,0 +1,89 @@
+"""Shared OpenAI client factory for the Raycast script commands.
+
+openai and httpx are only imported once a client is created, so the scripts
+can import this module up front.
+"""
+
+import atexit
+import contextlib
+import threading
+
+# Keep idle connections open so later requests skip the TCP and TLS handshake;
+# with HTTP/2, parallel requests such as TTS chunks share one connection
+CONNECTION_LIMITS = {
+    "max_connections": 10,
+    "max_keepalive_connections": 10,
+    "keepalive_expiry": 180,
+}
+# Upper bound for the warm-up request so it can never hold up the script
+WARM_UP_TIMEOUT = 3
+
+_clients = {}
+# The httpx clients behind them, warm_up() sends its request through these
+_http_clients = {}
+
+
+def get_client(api_key, base_url=None):
+    """Return the cached OpenAI client for this API key and base URL."""
+    key = (api_key, base_url)
+    if key not in _clients:
+        import httpx
+        from openai import DefaultHttpxClient, OpenAI
+
+        _http_clients[key] = DefaultHttpxClient(
+            http2=True, limits=httpx.Limits(**CONNECTION_LIMITS)
+        )
+        _clients[key] = OpenAI(
+            api_key=api_key, base_url=base_url, http_client=_http_clients[key]
+        )
+        # Shut the pooled connections down cleanly instead of leaving it to GC
+        atexit.register(_clients[key].close)
+    return _clients[key]
+
+
+def warm_up(api_key, base_url=None):
+    """Open a pooled connection to the API in the background, ahead of the first request."""
+    import httpx
+
+    url = str(get_client(api_key, base_url).base_url)
+    http_client = _http_clients[(api_key, base_url)]
+
+    def connect():
+        # Best effort only, the real request reports connection problems
+        with contextlib.suppress(httpx.HTTPError):
+            http_client.head(url, timeout=WARM_UP_TIMEOUT)
+
+    threading.Thread(target=connect, daemon=True).start()
+
+
+def start_warm_up(api_key):
+    """Import openai, create the client and warm up its connection in the background.
+
+    Join the returned thread before calling get_client, so the client is only created once.
+    """
+
+    def prepare():
+        # A broken install is reported by the script's own import of openai
+        with contextlib.suppress(ImportError):
+            warm_up(api_key)
+
+    thread = threading.Thread(target=prepare, daemon=True)
+    thread.start()
+    return thread
+
+
+def stream_response_text(client, **params):
+    """Yield the output text deltas of a streamed Responses API call."""
+    with client.responses.stream(**params) as stream:
+        for event in stream:
+            if event.type == "response.output_text.delta":
+                yield event.delta
+
+
+def stream_speech(client, chunk_size=None, **params):
+    """Yield the audio bytes of a streamed text-to-speech request.
+
+    Without a chunk_size, bytes are yielded as they arrive, which suits playback.
+    """
+    with client.audio.speech.with_streaming_response.create(**params) as response:
+        yield from response.iter_bytes(chunk_size)
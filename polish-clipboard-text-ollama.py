@@ -14,67 +14,101 @@
 
 import os
 import sys
-import pyperclip
-import ollama
-from dotenv import load_dotenv
 
+from cache import cache_key, get_cached, set_cached
+from clipboard import copy_to_clipboard, get_clipboard_text
+from env import ensure_env
+from polish import (
+    INSTRUCTIONS,
+    build_prompt,
+    join_polished_paragraphs,
+    needs_polishing,
+    print_progress,
+    split_paragraphs,
+)
 
-def main():
-    # Load environment variables from .env file
-    load_dotenv()
-
-    # Get model from environment variable
-    model = os.environ.get("OLLAMA_MODEL", "llama3.1:latest")
 
+def main():
     # Get mode selection from Raycast argument (default to standard professional)
     choice = sys.argv[1] if len(sys.argv) > 1 else "1"
-    if choice not in ["1", "2", "3"]:
+    if choice not in INSTRUCTIONS:
         choice = "1"
+    use_cache = "--no-cache" not in sys.argv[2:]
 
     try:
         # Get clipboard content
-        clipboard_content = pyperclip.paste()
+        clipboard_content = get_clipboard_text()
 
-        if not clipboard_content or not clipboard_content.strip():
+        if not clipboard_content or clipboard_content.isspace():
             print("❌ Clipboard is empty or contains no text.")
             sys.exit(1)
 
-        print("✨ Polishing text with local Ollama model...")
-
-        # Create input for text polishing based on selected mode
-        if choice == "1":
-            prompt = f"""Please polish and structure the following text while keeping the original language and intent.
-
-This is the text:
+        # Load environment variables from .env file
+        ensure_env()
+
+        if not needs_polishing(clipboard_content):
+            print("ℹ️ Nothing to polish, set POLISH_FORCE=1 to polish anyway")
+            return
+
+        # Get model from environment variable
+        model = os.environ.get("OLLAMA_MODEL", "llama3.1:latest")
+
+        # Reuse the result when the same text was already polished the same way
+        response_key = cache_key("ollama", model, choice, clipboard_content)
+        if use_cache:
+            cached_text = get_cached(response_key)
+            if cached_text is not None:
+                copy_to_clipboard(cached_text)
+                print(
+                    f"✅ Text polished with {model} (cached) and copied to clipboard!"
+                )
+                return
+
+        # Keep the model loaded between invocations to skip the model load
+        keep_alive = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+        if keep_alive.lstrip("-").isdigit():
+            # Ollama only accepts plain seconds (like -1 for forever) as a number
+            keep_alive = int(keep_alive)
 
-{clipboard_content}"""
-        elif choice == "2":
-            prompt = f"""Please polish and structure the following text while keeping the original language and intent. After the salutation, insert a "(smile)", and conclude with a "(y)". These are the shortcuts for Microsoft teams emojis.
-
-Return only the improved text, without any introduction or explanation.
-
-Here is the text:
-
-{clipboard_content}"""
-        else:  # choice == "3"
-            prompt = f"""Please polish and structure the following text while keeping the original language and intent. After the salutation, add 😃 emoji, and conclude with a 👍 emoji.
-
-Return only the polished text without any introduction or explanation:
+        print("✨ Polishing text with local Ollama model...")
 
-This is the text:
+        # The same prompt as the OpenAI script, with the text as the user message
+        instructions, text, batched = build_prompt(
+            split_paragraphs(clipboard_content), choice
+        )
 
-{clipboard_content}"""
+        # Imported only when there is text to polish, it is slow to import
+        import ollama
 
         # Call Ollama API
-        response = ollama.chat(
-            model=model, messages=[{"role": "user", "content": prompt}]
+        stream = ollama.chat(
+            model=model,
+            messages=[
+                {"role": "system", "content": instructions},
+                {"role": "user", "content": text},
+            ],
+            format="json" if batched else None,
+            stream=True,
+            keep_alive=keep_alive,
         )
 
-        # Extract polished text
-        polished_text = response["message"]["content"].strip()
+        # Collect the streamed polished text, showing progress as it arrives
+        chunks = []
+        received = 0
+        for chunk in stream:
+            content = chunk["message"]["content"]
+            chunks.append(content)
+            received += len(content)
+            print_progress(received)
+        print()
+        polished_text = "".join(chunks).strip()
+        if batched:
+            polished_text = join_polished_paragraphs(polished_text)
+
+        set_cached(response_key, polished_text)
 
         # Copy polished text back to clipboard
-        pyperclip.copy(polished_text)
+        copy_to_clipboard(polished_text)
 
         print(f"✅ Text polished with {model} and copied to clipboard!")
 
@@ -11,83 +11,258 @@
 # @raycast.packageName Text Processing
 # @raycast.needsConfirmation false
 # @raycast.argument1 {"type": "dropdown", "placeholder": "Select polishing mode", "data": [{"title": "Standard Professional", "value": "1"}, {"title": "Microsoft Teams Emojis", "value": "2"}, {"title": "Regular Emojis", "value": "3"}]}
+# @raycast.argument2 {"type": "dropdown", "placeholder": "Delivery", "optional": true, "data": [{"title": "Immediately", "value": "now"}, {"title": "Batch API (50% cheaper, up to 24h)", "value": "--batch"}]}
 
+import io
+import json
 import os
 import sys
-import pyperclip
-from openai import OpenAI
-from dotenv import load_dotenv
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
+import raycastd
+from cache import cache_key, get_cached, set_cached
+from clipboard import copy_to_clipboard, get_clipboard_text
+from env import ensure_env
+from openai_client import get_client, start_warm_up, stream_response_text
+from polish import (
+    INSTRUCTIONS,
+    build_prompt,
+    join_polished_paragraphs,
+    load_pending_batches,
+    needs_polishing,
+    print_progress,
+    save_pending_batches,
+    split_paragraphs,
+)
 
-def main():
-    # Load environment variables from .env file
-    load_dotenv()
+# Longer text is split at paragraphs and polished by parallel requests
+PARALLEL_POLISH_LENGTH = 4000
+POLISH_CHUNK_SIZE = 2000
+POLISH_WORKERS = 4
+# Rough size of an English token, close enough to refuse pasted documents
+CHARS_PER_TOKEN = 4
+MAX_INPUT_TOKENS = 32000
 
-    # Check for OpenAI API key
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
-        print(
-            "❌ OpenAI API key not found. Please set OPENAI_API_KEY environment variable."
-        )
-        sys.exit(1)
 
-    # Get model from environment variable
-    model = os.environ.get("MODEL", "gpt-5-mini")
+def group_paragraphs(paragraphs, max_length):
+    """Group consecutive paragraphs into chunks of at most max_length characters."""
+    groups = []
+    current = []
+    length = 0
+    for paragraph in paragraphs:
+        if current and length + len(paragraph) > max_length:
+            groups.append(current)
+            current = []
+            length = 0
+        current.append(paragraph)
+        length += len(paragraph)
+    if current:
+        groups.append(current)
+    return groups
+
+
+def build_request(paragraphs, choice):
+    """Build the request parameters for polishing paragraphs, and whether they are batched."""
+    instructions, text, batched = build_prompt(paragraphs, choice)
+    text_options = {"verbosity": "low"}
+    if batched:
+        text_options["format"] = {"type": "json_object"}
+
+    request = {"instructions": instructions, "input": text, "text": text_options}
+    return request, batched
+
+
+def submit_batch(
+    client, model, instructions, input_text, text_options, json_paragraphs
+):
+    """Submit the polish request to the Batch API and remember its ID."""
+    request = {
+        "custom_id": "polish",
+        "method": "POST",
+        "url": "/v1/responses",
+        "body": {
+            "model": model,
+            "instructions": instructions,
+            "input": input_text,
+            "text": text_options,
+        },
+    }
+    batch_input = io.BytesIO(json.dumps(request).encode("utf-8"))
+    batch_input.name = "polish.jsonl"
+
+    input_file = client.files.create(file=batch_input, purpose="batch")
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/responses",
+        completion_window="24h",
+    )
+
+    pending = load_pending_batches()
+    pending.append(
+        {
+            "batch_id": batch.id,
+            "json_paragraphs": json_paragraphs,
+            "submitted": int(time.time()),
+        }
+    )
+    save_pending_batches(pending)
+    return batch.id
+
 
+def polish_paragraphs(respond, model, paragraphs, choice, on_delta, cancelled):
+    """Stream the polished version of the paragraphs, stopping early once cancelled."""
+    request, batched = build_request(paragraphs, choice)
+    stream = respond(model=model, **request)
+    chunks = []
+    try:
+        for delta in stream:
+            if cancelled.is_set():
+                return None
+            chunks.append(delta)
+            on_delta(len(delta))
+    finally:
+        # Closing the stream closes the connection, also on Ctrl-C
+        stream.close()
+
+    polished_text = "".join(chunks).strip()
+    if batched:
+        polished_text = join_polished_paragraphs(polished_text)
+    return polished_text
+
+
+def main():
     # Get mode selection from Raycast argument (default to standard professional)
     choice = sys.argv[1] if len(sys.argv) > 1 else "1"
-    if choice not in ["1", "2", "3"]:
+    if choice not in INSTRUCTIONS:
         choice = "1"
+    use_batch_api = "--batch" in sys.argv[2:]
+    use_cache = "--no-cache" not in sys.argv[2:]
+
+    # The .env file also provides MODEL and POLISH_FORCE
+    ensure_env("OPENAI_API_KEY")
+    api_key = os.environ.get("OPENAI_API_KEY")
+
+    # A running raycastd already holds a warm OpenAI client, otherwise import
+    # openai and connect to the API while the clipboard is read
+    use_daemon = not use_batch_api and raycastd.is_running()
+    warm_up_thread = None
+    if api_key and not use_daemon:
+        warm_up_thread = start_warm_up(api_key)
 
     try:
         # Get clipboard content
-        clipboard_content = pyperclip.paste()
+        clipboard_content = get_clipboard_text()
 
-        if not clipboard_content or not clipboard_content.strip():
+        if not clipboard_content or clipboard_content.isspace():
             print("❌ Clipboard is empty or contains no text.")
             sys.exit(1)
 
-        print("✨ Polishing text...")
+        if not needs_polishing(clipboard_content):
+            print("ℹ️ Nothing to polish, set POLISH_FORCE=1 to polish anyway")
+            return
 
-        # Initialize OpenAI client
-        client = OpenAI(api_key=api_key)
+        # Refuse oversized input before paying for it, without loading a tokenizer
+        estimated_tokens = len(clipboard_content) // CHARS_PER_TOKEN
+        if estimated_tokens > MAX_INPUT_TOKENS:
+            print(
+                f"❌ Clipboard text is too long to polish (~{estimated_tokens} tokens, "
+                f"limit {MAX_INPUT_TOKENS})"
+            )
+            sys.exit(1)
+
+        # Get model from environment variable
+        model = os.environ.get("MODEL", "gpt-5-mini")
 
-        # Create input for text polishing based on selected mode
-        if choice == "1":
-            input_text = f"""Please polish and structure the following text while keeping the original language and intent.
+        # Reuse the result when the same text was already polished the same way
+        response_key = cache_key(model, choice, clipboard_content)
+        if use_cache and not use_batch_api:
+            cached_text = get_cached(response_key)
+            if cached_text is not None:
+                copy_to_clipboard(cached_text)
+                print("✅ Text polished (cached) and copied to clipboard!")
+                return
 
-This is the text:
+        if use_daemon:
+            respond = partial(raycastd.open_stream, "respond")
+        else:
+            # Check for OpenAI API key
+            if not api_key:
+                print(
+                    "❌ OpenAI API key not found. Please set OPENAI_API_KEY environment variable."
+                )
+                sys.exit(1)
 
-{clipboard_content}"""
-        elif choice == "2":
-            input_text = f"""Please polish and structure the following text while keeping the original language and intent. After the salutation, insert a "(smile)", and conclude with a "(y)". These are the shortcuts for Microsoft teams emojis.
+            # The warm-up thread may still be creating the shared client
+            warm_up_thread.join()
+            client = get_client(api_key)
+            respond = partial(stream_response_text, client)
 
-Return only the improved text, without any introduction or explanation.
+        print("✨ Polishing text...")
 
-Here is the text:
+        paragraphs = split_paragraphs(clipboard_content)
 
-{clipboard_content}"""
-        else:  # choice == "3"
-            input_text = f"""Please polish and structure the following text while keeping the original language and intent. After the salutation, add 😃 emoji, and conclude with a 👍 emoji.
+        if use_batch_api:
+            request, batched = build_request(paragraphs, choice)
+            batch_id = submit_batch(
+                client,
+                model,
+                request["instructions"],
+                request["input"],
+                request["text"],
+                batched,
+            )
+            print(f"📨 Submitted batch {batch_id}, run Poll Polished Text to fetch it")
+            return
 
-Return only the polished text without any introduction or explanation:
+        # Long text is polished in parallel parts. Only the standard mode can be
+        # split, the emoji modes decorate the salutation and end of the whole text.
+        groups = [paragraphs]
+        if choice == "1" and len(clipboard_content) > PARALLEL_POLISH_LENGTH:
+            groups = group_paragraphs(paragraphs, POLISH_CHUNK_SIZE)
 
-This is the text:
+        # Collect the streamed polished text, showing progress as it arrives
+        received = 0
+        progress_lock = threading.Lock()
+        cancelled = threading.Event()
 
-{clipboard_content}"""
+        def on_delta(length):
+            nonlocal received
+            with progress_lock:
+                received += length
+                print_progress(received)
 
-        # Call OpenAI API using GPT-5 responses API
-        response = client.responses.create(
-            model=model,
-            input=input_text,
-            text={"verbosity": "low"},
+        polish = partial(
+            polish_paragraphs,
+            respond,
+            model,
+            choice=choice,
+            on_delta=on_delta,
+            cancelled=cancelled,
         )
+        try:
+            if len(groups) == 1:
+                polished_text = polish(groups[0])
+            else:
+                executor = ThreadPoolExecutor(max_workers=POLISH_WORKERS)
+                try:
+                    polished_text = "\n\n".join(executor.map(polish, groups))
+                except KeyboardInterrupt:
+                    cancelled.set()
+                    raise
+                finally:
+                    executor.shutdown(cancel_futures=True)
+        except KeyboardInterrupt:
+            print("\n🛑 Polishing cancelled, clipboard left unchanged.")
+            sys.exit(130)
+        print()
 
-        # Extract polished text
-        polished_text = response.output_text.strip()
+        set_cached(response_key, polished_text)
 
         # Copy polished text back to clipboard
-        pyperclip.copy(polished_text)
+        copy_to_clipboard(polished_text)
 
         print("✅ Text polished and copied to clipboard!")
 
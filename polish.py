@@ -0,0 +1,77 @@
+"""Prompts and text helpers shared by the polish script commands."""
+
+import json
+import os
+from pathlib import Path
+
+# Polishing instructions per mode. They go out separately from the clipboard
+# text, so the identical prefix of every request can be served from the prompt cache.
+INSTRUCTIONS = {
+    "1": """Please polish and structure the text you are given while keeping the original language and intent.""",
+    "2": """Please polish and structure the text you are given while keeping the original language and intent. After the salutation, insert a "(smile)", and conclude with a "(y)". These are the shortcuts for Microsoft teams emojis.
+
+Return only the improved text, without any introduction or explanation.""",
+    "3": """Please polish and structure the text you are given while keeping the original language and intent. After the salutation, add 😃 emoji, and conclude with a 👍 emoji.
+
+Return only the polished text without any introduction or explanation.""",
+}
+
+BATCH_INSTRUCTIONS = """The text is given as a JSON array of paragraphs. Polish each paragraph and return a JSON object of the form {"paragraphs": [...]} with one polished entry per paragraph, in the original order."""
+
+# Batch API jobs submitted by polish-clipboard-text.py --batch, fetched by poll-polish.py
+PENDING_BATCHES_FILE = Path.home() / ".cache" / "raycast-polish" / "pending.json"
+
+# Shorter clipboard text is not sent to the model
+MIN_POLISH_LENGTH = 20
+
+
+def needs_polishing(text):
+    """Whether the text is long enough to be worth a model call."""
+    if os.environ.get("POLISH_FORCE") == "1":
+        return True
+    return len(text.strip()) >= MIN_POLISH_LENGTH
+
+
+def split_paragraphs(text):
+    """Split text into its non-empty paragraphs."""
+    return [paragraph.strip() for paragraph in text.split("\n\n") if paragraph.strip()]
+
+
+def build_prompt(paragraphs, choice):
+    """Return the instructions and input text for the paragraphs, and whether they are batched."""
+    # Send multi-paragraph text as one batched JSON prompt
+    batched = len(paragraphs) > 1
+    text = json.dumps(paragraphs, ensure_ascii=False) if batched else paragraphs[0]
+
+    # The instructions for the selected mode, the clipboard text is the input
+    instructions = INSTRUCTIONS[choice]
+    if batched:
+        instructions = f"{BATCH_INSTRUCTIONS}\n\n{instructions}"
+    return instructions, text, batched
+
+
+def join_polished_paragraphs(response_text):
+    """Join the paragraphs of a batched JSON response back into one text."""
+    paragraphs = json.loads(response_text).get("paragraphs")
+    if not paragraphs or not all(isinstance(p, str) for p in paragraphs):
+        raise ValueError("Model returned no polished paragraphs")
+    return "\n\n".join(paragraph.strip() for paragraph in paragraphs)
+
+
+def load_pending_batches():
+    """Load the Batch API jobs that were submitted but not yet retrieved."""
+    try:
+        return json.loads(PENDING_BATCHES_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+
+
+def save_pending_batches(pending):
+    """Persist the Batch API jobs that still need to be retrieved."""
+    PENDING_BATCHES_FILE.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    PENDING_BATCHES_FILE.write_text(json.dumps(pending), encoding="utf-8")
+
+
+def print_progress(received):
+    """Overwrite the current output line with the number of characters received."""
+    print(f"\r✍️ Receiving polished text ({received} characters)...", end="", flush=True)
@@ -0,0 +1,142 @@
+#!/Users/alex/Code/raycast-script-commands/.venv/bin/python
+
+# Required parameters
+# @raycast.schemaVersion 1
+# @raycast.title Poll Polished Text
+# @raycast.mode compact
+
+# Optional parameters
+# @raycast.icon 📬
+# @raycast.description Fetch text polished via the OpenAI Batch API and copy it to the clipboard
+# @raycast.packageName Text Processing
+# @raycast.needsConfirmation false
+
+import json
+import os
+import subprocess
+import sys
+
+from clipboard import copy_to_clipboard
+from env import ensure_env
+from polish import (
+    join_polished_paragraphs,
+    load_pending_batches,
+    save_pending_batches,
+)
+
+FAILED_STATUSES = {"failed", "expired", "cancelled"}
+
+
+def read_batch_result(client, file_id):
+    """Read the result line of the single polish request from a batch file."""
+    return json.loads(client.files.content(file_id).text.splitlines()[0])
+
+
+def get_result_error(result):
+    """The error message of a batch result line, or None if the request succeeded."""
+    if result.get("error"):
+        return result["error"].get("message", "Batch request failed")
+    response = result.get("response") or {}
+    if response.get("status_code") != 200:
+        error = (response.get("body") or {}).get("error") or {}
+        return error.get(
+            "message", f"Batch request returned {response.get('status_code')}"
+        )
+    return None
+
+
+def get_batch_output_text(client, batch):
+    """Extract the polished text from the output file of a completed batch."""
+    # A batch whose only request failed has an error file but no output file
+    if not batch.output_file_id:
+        if batch.error_file_id:
+            error = get_result_error(read_batch_result(client, batch.error_file_id))
+            raise ValueError(error or "Batch request failed")
+        raise ValueError("Batch has no output file")
+
+    result = read_batch_result(client, batch.output_file_id)
+    error = get_result_error(result)
+    if error:
+        raise ValueError(error)
+
+    body = result["response"]["body"]
+    return "".join(
+        content["text"]
+        for item in body["output"]
+        if item["type"] == "message"
+        for content in item["content"]
+        if content["type"] == "output_text"
+    ).strip()
+
+
+def main():
+    ensure_env("OPENAI_API_KEY")
+
+    # Check for OpenAI API key
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        print(
+            "❌ OpenAI API key not found. Please set OPENAI_API_KEY environment variable."
+        )
+        sys.exit(1)
+
+    pending = load_pending_batches()
+    if not pending:
+        print("ℹ️ No pending polish batches")
+        return
+
+    # Imported only when there are batches to check, it is slow to import
+    from openai import APIError
+
+    from openai_client import get_client
+
+    try:
+        client = get_client(api_key)
+
+        # Oldest batch first: copy the first finished one, keep the rest pending
+        still_pending = []
+        polished_text = None
+        remaining = iter(pending)
+        try:
+            for entry in remaining:
+                try:
+                    batch = client.batches.retrieve(entry["batch_id"])
+                    if batch.status == "completed":
+                        polished_text = get_batch_output_text(client, batch)
+                        if entry.get("json_paragraphs"):
+                            polished_text = join_polished_paragraphs(polished_text)
+                        break
+                    if batch.status in FAILED_STATUSES:
+                        print(f"❌ Batch {batch.id} {batch.status}, dropping it")
+                    else:
+                        still_pending.append(entry)
+                except APIError as e:
+                    # The API could not be reached, try this batch again next time
+                    print(f"⚠️ Could not check batch {entry['batch_id']}: {e}")
+                    still_pending.append(entry)
+                except (KeyError, IndexError, TypeError, ValueError) as e:
+                    # A broken result would otherwise block every later batch
+                    print(
+                        f"❌ Batch {entry.get('batch_id')} has no usable result ({e}), dropping it"
+                    )
+        finally:
+            # Batches after the copied one, or after an unexpected error, stay pending
+            still_pending.extend(remaining)
+            save_pending_batches(still_pending)
+
+        if polished_text is None:
+            print(f"⏳ {len(still_pending)} batch(es) still processing")
+            return
+
+        copy_to_clipboard(polished_text)
+        print(
+            f"✅ Polished text copied to clipboard! ({len(still_pending)} batch(es) left)"
+        )
+
+    except (APIError, KeyError, OSError, ValueError, subprocess.SubprocessError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
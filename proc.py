@@ -0,0 +1,17 @@
+"""Process helpers shared by the Raycast script commands."""
+
+import subprocess
+
+
+# subprocess only spawns children with the faster posix_spawn instead of
+# fork/exec when close_fds is False and the executable is given with a
+# directory, which is why helper binaries are called by absolute path. This
+# is safe because Python's own file descriptors are non-inheritable (PEP 446).
+def run(args, *, check=False, **kwargs):
+    """subprocess.run on the posix_spawn fast path."""
+    return subprocess.run(args, check=check, close_fds=False, **kwargs)
+
+
+def popen(args, **kwargs):
+    """subprocess.Popen on the posix_spawn fast path."""
+    return subprocess.Popen(args, close_fds=False, **kwargs)
@@ -0,0 +1,182 @@
+#!/Users/alex/Code/raycast-script-commands/.venv/bin/python
+
+"""Background daemon that keeps a warm OpenAI client for the Raycast scripts.
+
+Each Raycast run is a fresh Python process that would otherwise import openai
+and open a new TLS connection. When raycastd is running, the polish and TTS
+scripts send their API calls over a Unix socket instead and only pay for
+connecting to it. Run it with launchd using raycastd.plist, or directly with
+`uv run raycastd.py`.
+
+Requests are one JSON line {"command": ..., "params": {...}}. The reply is
+JSON lines of {"text": ...} or {"data": <base64>} chunks, ending with
+{"done": true} or {"error": ...}.
+"""
+
+import base64
+import json
+import os
+import socket
+import socketserver
+import sys
+from functools import partial
+from pathlib import Path
+
+SOCKET_PATH = Path.home() / ".cache" / "raycastd" / "raycastd.sock"
+
+
+def is_running():
+    """Whether a daemon is accepting connections on the socket."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(SOCKET_PATH))
+        return True
+    except OSError:
+        return False
+
+
+def start_speech():
+    """Return a callable that streams text-to-speech audio, or None without an API key.
+
+    The audio comes from raycastd when it is running. Otherwise the OpenAI
+    client is created and warmed up in the background while the caller goes on.
+    """
+    if is_running():
+        return partial(open_stream, "speech")
+
+    from env import ensure_env
+
+    ensure_env("OPENAI_API_KEY")
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        return None
+
+    from openai_client import get_client, start_warm_up, stream_speech
+
+    warm_up_thread = start_warm_up(api_key)
+
+    def speech(**params):
+        # The warm-up thread may still be creating the shared client
+        warm_up_thread.join()
+        return stream_speech(get_client(api_key), **params)
+
+    return speech
+
+
+def open_stream(command, **params):
+    """Run a command on the daemon and return an iterator over its output chunks."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(SOCKET_PATH))
+    except OSError:
+        sock.close()
+        raise RuntimeError("raycastd is not running")
+
+    request = {"command": command, "params": params}
+    sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+    return read_stream(sock)
+
+
+def read_stream(sock):
+    """Yield the chunks of a daemon reply until it reports completion."""
+    with sock, sock.makefile("rb") as reply:
+        for line in reply:
+            message = json.loads(line)
+            if "text" in message:
+                yield message["text"]
+            elif "data" in message:
+                yield base64.b64decode(message["data"])
+            elif "error" in message:
+                raise RuntimeError(message["error"])
+            else:
+                return
+    raise RuntimeError("raycastd closed the connection before finishing")
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """Run one streamed OpenAI call per connection on the shared client."""
+
+    def send(self, message):
+        self.wfile.write(json.dumps(message).encode("utf-8") + b"\n")
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+
+        try:
+            request = json.loads(line)
+            command = self.server.commands.get(request.get("command"))
+            if command is None:
+                raise ValueError(f"Unknown command: {request.get('command')}")
+
+            for chunk in command(self.server.openai_client, **request["params"]):
+                if isinstance(chunk, bytes):
+                    self.send({"data": base64.b64encode(chunk).decode("ascii")})
+                else:
+                    self.send({"text": chunk})
+            self.send({"done": True})
+        except (BrokenPipeError, ConnectionResetError):
+            # The script went away, e.g. it was cancelled with Ctrl-C
+            pass
+        except self.server.request_errors as e:
+            # Anything else is a daemon bug, socketserver logs its traceback
+            try:
+                self.send({"error": str(e)})
+            except OSError:
+                pass
+
+
+def main():
+    from env import ensure_env
+
+    ensure_env()
+
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        print(
+            "❌ OpenAI API key not found. Please set OPENAI_API_KEY environment variable."
+        )
+        sys.exit(1)
+
+    if is_running():
+        print(f"ℹ️ raycastd is already running on {SOCKET_PATH}")
+        return
+
+    from openai import APIError
+
+    from openai_client import get_client, stream_response_text, stream_speech, warm_up
+
+    # mkdir leaves an existing directory's mode alone, so set it every time
+    SOCKET_PATH.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    os.chmod(SOCKET_PATH.parent, 0o700)
+    SOCKET_PATH.unlink(missing_ok=True)
+
+    # Bind under a umask that creates the socket as 0600, so it is never open to others
+    old_umask = os.umask(0o177)
+    try:
+        server = socketserver.ThreadingUnixStreamServer(
+            str(SOCKET_PATH), RequestHandler
+        )
+    finally:
+        os.umask(old_umask)
+    server.daemon_threads = True
+
+    server.openai_client = get_client(api_key)
+    server.commands = {"respond": stream_response_text, "speech": stream_speech}
+    # Failed API calls and malformed requests are reported back to the script
+    server.request_errors = (APIError, KeyError, TypeError, ValueError)
+    warm_up(api_key)
+
+    print(f"🚀 raycastd listening on {SOCKET_PATH}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        SOCKET_PATH.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@
 # @raycast.mode compact
 # @raycast.argument1 {"type": "dropdown", "placeholder": "TTS Engine", "data": [{"title": "macOS Built-in TTS", "value": "macos"}, {"title": "OpenAI TTS", "value": "openai"}]}
 # @raycast.argument2 {"type": "dropdown", "placeholder": "Voice (OpenAI only)", "data": [{"title": "Coral", "value": "coral"}, {"title": "Alloy", "value": "alloy"}, {"title": "Echo", "value": "echo"}, {"title": "Fable", "value": "fable"}, {"title": "Nova", "value": "nova"}, {"title": "Onyx", "value": "onyx"}, {"title": "Shimmer", "value": "shimmer"}, {"title": "Ash", "value": "ash"}, {"title": "Ballad", "value": "ballad"}, {"title": "Sage", "value": "sage"}], "optional": true}
+# @raycast.argument3 {"type": "dropdown", "placeholder": "Format (macOS only)", "data": [{"title": "MP3", "value": "mp3"}, {"title": "M4A (AAC)", "value": "m4a"}, {"title": "AIFF", "value": "aiff"}], "optional": true}
 
 # Optional parameters
 # @raycast.icon 💾
@@ -12,107 +13,234 @@
 # @raycast.packageName TTS
 # @raycast.needsConfirmation false
 
+import os
+import re
+import shutil
 import subprocess
 import sys
-import os
+import tempfile
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from openai import OpenAI
-from dotenv import load_dotenv
 
+import raycastd
+from cache import cache_key, get_cached_audio, set_cached_audio
+from proc import popen, run
+from tts import TTS_MODEL, get_clipboard_text
 
-def get_clipboard_text() -> str:
-    """Get text from clipboard using pbpaste."""
-    try:
-        result = subprocess.run(["pbpaste"], capture_output=True, text=True, check=True)
-        return result.stdout.strip()
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Failed to get clipboard content: {e}")
-        return ""
-    except Exception as e:
-        print(f"❌ Unexpected error getting clipboard: {e}")
-        return ""
+SAY = "/usr/bin/say"
+FFMPEG = shutil.which("ffmpeg") or "ffmpeg"
+
+# Sample rate of the 32-bit float CAF audio that `say` hands to ffmpeg. CAF can
+# be written to a pipe, AIFF needs a seekable file to patch its chunk sizes
+SAY_SAMPLE_RATE = 22050
+# Formats `say` writes itself, AAC goes through the AudioToolbox encoder,
+# only MP3 needs a second pass through ffmpeg
+SAY_FILE_FORMATS = {
+    "m4a": ["--file-format=m4af", "--data-format=aac"],
+    "aiff": ["--file-format=AIFF"],
+}
+AUDIO_FORMATS = ["mp3", *SAY_FILE_FORMATS]
+# Longer text is split at sentence ends into chunks of about this many characters
+TTS_CHUNK_SIZE = 300
+SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
+# Read size for downloaded audio, large reads mean few write() calls
+AUDIO_READ_SIZE = 64 * 1024
+TTS_WORKERS = 4
 
 
 def save_to_audio(
-    text: str, output_path: str, engine: str = "macos", voice: str = "coral"
+    text: str,
+    output_path: str,
+    engine: str = "macos",
+    voice: str = "coral",
+    audio_format: str = "mp3",
+    speech: Callable | None = None,
 ):
     """Save text to audio file using specified TTS engine."""
     if engine == "openai":
-        save_with_openai_tts(text, output_path, voice)
+        save_with_openai_tts(text, output_path, voice, speech)
     else:
-        save_with_builtin_tts(text, output_path)
+        save_with_builtin_tts(text, output_path, audio_format)
 
 
-def save_with_builtin_tts(text: str, output_path: str):
-    """Save text to audio file using macOS built-in TTS, converting to MP3."""
+def save_with_builtin_tts(text: str, output_path: str, audio_format: str = "mp3"):
+    """Save text to audio file using macOS built-in TTS."""
     try:
-        # Generate temporary AIFF file
-        temp_aiff = output_path.replace(".mp3", "_temp.aiff")
-
         print(f"🎵 Saving to audio file with macOS TTS: {output_path}")
 
-        # Create AIFF with say command
-        subprocess.run(["say", "-o", temp_aiff, text], check=True, capture_output=True)
+        # say reads the text from stdin, which has no argv size limit
+        if audio_format in SAY_FILE_FORMATS:
+            run(
+                [SAY, "-o", output_path, *SAY_FILE_FORMATS[audio_format]],
+                input=text.encode("utf-8"),
+                check=True,
+                capture_output=True,
+            )
+            print("✅ Audio file saved successfully!")
+            print(f"📁 File location: {output_path}")
+            return
 
-        # Convert AIFF to MP3 using ffmpeg
-        subprocess.run(
+        # Stream CAF audio from say straight into ffmpeg so both run at the same time
+        say = popen(
             [
-                "ffmpeg",
-                "-i",
-                temp_aiff,
-                "-codec:a",
-                "libmp3lame",
-                "-b:a",
-                "128k",
-                output_path,
-                "-y",
+                SAY,
+                "-o",
+                "/dev/stdout",
+                "--file-format=caff",
+                f"--data-format=LEF32@{SAY_SAMPLE_RATE}",
             ],
-            check=True,
-            stdout=subprocess.DEVNULL,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
             stderr=subprocess.DEVNULL,
         )
+        try:
+            ffmpeg = popen(
+                [
+                    FFMPEG,
+                    "-f",
+                    "caf",
+                    "-i",
+                    "-",
+                    "-codec:a",
+                    "libmp3lame",
+                    "-b:a",
+                    "128k",
+                    output_path,
+                    "-y",
+                ],
+                stdin=say.stdout,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError:
+            say.kill()
+            raise
+        finally:
+            # Only ffmpeg reads the pipe now, say gets SIGPIPE if ffmpeg exits early
+            say.stdout.close()
+
+        # ffmpeg already drains say's output, so feeding the text cannot deadlock
+        try:
+            say.stdin.write(text.encode("utf-8"))
+        finally:
+            say.stdin.close()
 
-        # Clean up temporary file
-        os.remove(temp_aiff)
+        for process in (ffmpeg, say):
+            if process.wait() != 0:
+                raise subprocess.CalledProcessError(process.returncode, process.args)
 
         print("✅ Audio file saved successfully!")
         print(f"📁 File location: {output_path}")
     except subprocess.CalledProcessError as e:
         print(f"❌ Failed to save audio: {e}")
-        # Clean up temp file if it exists
-        temp_aiff = output_path.replace(".mp3", "_temp.aiff")
-        if os.path.exists(temp_aiff):
-            os.remove(temp_aiff)
         sys.exit(1)
     except Exception as e:
         print(f"❌ Audio save error: {e}")
         sys.exit(1)
 
 
-def save_with_openai_tts(text: str, output_path: str, voice: str = "coral"):
+def split_into_chunks(text: str, max_length: int = TTS_CHUNK_SIZE) -> list:
+    """Group the sentences of the text into chunks of about max_length characters."""
+    chunks = []
+    current = ""
+    for sentence in SENTENCE_BREAK.split(text.strip()):
+        if current and len(current) + 1 + len(sentence) > max_length:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def save_speech(speech, text: str, voice: str, output_path: str):
+    """Generate speech for the text with OpenAI TTS and save it as MP3."""
+    audio = speech(
+        model=TTS_MODEL,
+        voice=voice,
+        input=text,
+        response_format="mp3",
+        chunk_size=AUDIO_READ_SIZE,
+    )
+    # The chunks are already large, so skip the extra copy through a write buffer
+    with open(output_path, "wb", buffering=0) as f:
+        f.writelines(audio)
+
+
+def concat_mp3_files(part_paths: list, output_path: str, temp_dir: str):
+    """Join MP3 files into one with ffmpeg's concat demuxer, without re-encoding."""
+    list_path = os.path.join(temp_dir, "parts.txt")
+    with open(list_path, "w", encoding="utf-8") as f:
+        f.writelines(f"file '{path}'\n" for path in part_paths)
+
+    run(
+        [
+            FFMPEG,
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            list_path,
+            "-c",
+            "copy",
+            output_path,
+            "-y",
+        ],
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def save_with_openai_tts(
+    text: str,
+    output_path: str,
+    voice: str = "coral",
+    speech: Callable | None = None,
+):
     """Save text to audio file using OpenAI TTS API."""
     try:
-        # Load environment variables
-        load_dotenv()
+        print(f"🎵 Saving to audio file with OpenAI TTS ({voice} voice): {output_path}")
+
+        # Reuse the audio when the same text was already converted with this voice
+        audio_key = cache_key(TTS_MODEL, voice, "mp3", text)
+        cached_audio = get_cached_audio(audio_key, ".mp3")
+        if cached_audio is not None:
+            shutil.copyfile(cached_audio, output_path)
+            print("✅ Audio file saved successfully (cached)!")
+            print(f"📁 File location: {output_path}")
+            return
 
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
+        if speech is None:
             print(
                 "❌ OpenAI API key not found. Please set OPENAI_API_KEY environment variable."
             )
             sys.exit(1)
 
-        print(f"🎵 Saving to audio file with OpenAI TTS ({voice} voice): {output_path}")
-
-        client = OpenAI(api_key=api_key)
+        chunks = split_into_chunks(text)
+        if len(chunks) == 1:
+            save_speech(speech, text, voice, output_path)
+        else:
+            # Generate the parts in parallel and join them without re-encoding
+            print(f"⚡ Generating {len(chunks)} parts in parallel...")
+            with tempfile.TemporaryDirectory() as temp_dir:
+                part_paths = [
+                    os.path.join(temp_dir, f"chunk_{i}.mp3") for i in range(len(chunks))
+                ]
+                with ThreadPoolExecutor(max_workers=TTS_WORKERS) as executor:
+                    list(
+                        executor.map(
+                            lambda chunk, path: save_speech(speech, chunk, voice, path),
+                            chunks,
+                            part_paths,
+                        )
+                    )
+                concat_mp3_files(part_paths, output_path, temp_dir)
 
-        # Create speech and save directly as MP3
-        with client.audio.speech.with_streaming_response.create(
-            model="gpt-4o-mini-tts", voice=voice, input=text, response_format="mp3"
-        ) as response:
-            with open(output_path, "wb") as f:
-                for chunk in response.iter_bytes():
-                    f.write(chunk)
+        set_cached_audio(audio_key, ".mp3", output_path)
 
         print("✅ Audio file saved successfully!")
         print(f"📁 File location: {output_path}")
@@ -122,11 +250,11 @@ def save_with_openai_tts(text: str, output_path: str, voice: str = "coral"):
         sys.exit(1)
 
 
-def generate_filename() -> str:
+def generate_filename(extension: str = "mp3") -> str:
     """Generate a unique filename for the audio file."""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     desktop_path = os.path.expanduser("~/Desktop")
-    return os.path.join(desktop_path, f"clipboard_audio_{timestamp}.mp3")
+    return os.path.join(desktop_path, f"clipboard_audio_{timestamp}.{extension}")
 
 
 def main():
@@ -134,6 +262,13 @@ def main():
     # Parse command line arguments
     engine = sys.argv[1] if len(sys.argv) > 1 else "macos"
     voice = sys.argv[2] if len(sys.argv) > 2 else "coral"
+    # OpenAI TTS always delivers MP3
+    audio_format = sys.argv[3] if len(sys.argv) > 3 else "mp3"
+    if engine == "openai" or audio_format not in AUDIO_FORMATS:
+        audio_format = "mp3"
+
+    # Connect to raycastd or warm up the OpenAI client while the clipboard is read
+    speech = raycastd.start_speech() if engine == "openai" else None
 
     text = get_clipboard_text()
 
@@ -145,8 +280,8 @@ def main():
         f"📝 Text to convert ({len(text)} characters): {text[:100]}{'...' if len(text) > 100 else ''}"
     )
 
-    output_path = generate_filename()
-    save_to_audio(text, output_path, engine, voice)
+    output_path = generate_filename(audio_format)
+    save_to_audio(text, output_path, engine, voice, audio_format, speech)
 
 
 if __name__ == "__main__":
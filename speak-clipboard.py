@@ -12,31 +12,31 @@
 # @raycast.packageName TTS
 # @raycast.needsConfirmation false
 
+import os
+import shutil
 import subprocess
 import sys
-import os
 import tempfile
-from openai import OpenAI
-from dotenv import load_dotenv
+from collections.abc import Callable
 
+import raycastd
+from cache import cache_key, get_cached_audio, set_cached_audio
+from proc import popen, run
+from tts import TTS_MODEL, get_clipboard_text
 
-def get_clipboard_text() -> str:
-    """Get text from clipboard using pbpaste."""
-    try:
-        result = subprocess.run(["pbpaste"], capture_output=True, text=True, check=True)
-        return result.stdout.strip()
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Failed to get clipboard content: {e}")
-        return ""
-    except Exception as e:
-        print(f"❌ Unexpected error getting clipboard: {e}")
-        return ""
+SAY = "/usr/bin/say"
+AFPLAY = "/usr/bin/afplay"
 
 
-def speak(text: str, engine: str = "macos", voice: str = "coral"):
+def speak(
+    text: str,
+    engine: str = "macos",
+    voice: str = "coral",
+    speech: Callable | None = None,
+):
     """Convert text to speech using specified engine."""
     if engine == "openai":
-        use_openai_tts(text, voice)
+        use_openai_tts(text, voice, speech)
     else:
         use_builtin_tts(text)
 
@@ -45,7 +45,9 @@ def use_builtin_tts(text: str):
     """macOS built-in text-to-speech."""
     try:
         print("🗣️ Using macOS TTS...")
-        subprocess.run(["say", text], check=True, capture_output=True)
+        # say reads the text from stdin, which has no argv size limit, and its
+        # output is left alone as it only ever writes errors
+        run([SAY], input=text.encode("utf-8"), check=True)
         print("✅ Speech completed!")
     except subprocess.CalledProcessError as e:
         print(f"❌ TTS failed: {e}")
@@ -55,38 +57,81 @@ def use_builtin_tts(text: str):
         sys.exit(1)
 
 
-def use_openai_tts(text: str, voice: str = "coral"):
+def record_chunks(chunks, file):
+    """Yield the audio chunks while also writing them to the file."""
+    for chunk in chunks:
+        file.write(chunk)
+        yield chunk
+
+
+def play_audio_stream(ffplay, chunks):
+    """Play audio while it downloads by piping it into ffplay."""
+    player = popen(
+        [ffplay, "-nodisp", "-autoexit", "-loglevel", "quiet", "-i", "-"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        bufsize=0,
+    )
+    try:
+        for chunk in chunks:
+            player.stdin.write(chunk)
+    finally:
+        player.stdin.close()
+
+    if player.wait() != 0:
+        raise subprocess.CalledProcessError(player.returncode, player.args)
+
+
+def play_audio_file(chunks):
+    """Save the downloaded audio to a temporary file and play it with afplay."""
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
+        temp_path = temp_file.name
+        for chunk in chunks:
+            temp_file.write(chunk)
+
+    # Play the audio file
+    run([AFPLAY, temp_path], check=True, capture_output=True)
+
+    # Clean up temp file
+    os.unlink(temp_path)
+
+
+def use_openai_tts(text: str, voice: str = "coral", speech: Callable | None = None):
     """OpenAI text-to-speech API."""
     try:
-        # Load environment variables
-        load_dotenv()
+        print(f"🤖 Using OpenAI TTS with {voice} voice...")
+
+        # Replay the audio when the same text was already spoken with this voice
+        audio_key = cache_key(TTS_MODEL, voice, "wav", text)
+        cached_audio = get_cached_audio(audio_key, ".wav")
+        if cached_audio is not None:
+            run(
+                [AFPLAY, str(cached_audio)],
+                check=True,
+                capture_output=True,
+            )
+            print("✅ Speech completed (cached)!")
+            return
 
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
+        if speech is None:
             print(
                 "❌ OpenAI API key not found. Please set OPENAI_API_KEY environment variable."
             )
             sys.exit(1)
 
-        print(f"🤖 Using OpenAI TTS with {voice} voice...")
-
-        client = OpenAI(api_key=api_key)
+        audio = speech(model=TTS_MODEL, voice=voice, input=text, response_format="wav")
 
-        # Create speech with streaming to play immediately
-        with client.audio.speech.with_streaming_response.create(
-            model="gpt-4o-mini-tts", voice=voice, input=text, response_format="wav"
-        ) as response:
-            # Save to temporary file and play with afplay
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                temp_path = temp_file.name
-                for chunk in response.iter_bytes():
-                    temp_file.write(chunk)
-
-            # Play the audio file
-            subprocess.run(["afplay", temp_path], check=True, capture_output=True)
-
-            # Clean up temp file
-            os.unlink(temp_path)
+        # Play the speech while it streams in, keeping a copy for the cache
+        with tempfile.NamedTemporaryFile(suffix=".wav") as recording:
+            audio = record_chunks(audio, recording)
+            ffplay = shutil.which("ffplay")
+            if ffplay:
+                play_audio_stream(ffplay, audio)
+            else:
+                play_audio_file(audio)
+            recording.flush()
+            set_cached_audio(audio_key, ".wav", recording.name)
 
         print("✅ Speech completed!")
 
@@ -101,6 +146,9 @@ def main():
     engine = sys.argv[1] if len(sys.argv) > 1 else "macos"
     voice = sys.argv[2] if len(sys.argv) > 2 else "coral"
 
+    # Connect to raycastd or warm up the OpenAI client while the clipboard is read
+    speech = raycastd.start_speech() if engine == "openai" else None
+
     text = get_clipboard_text()
 
     if not text:
@@ -110,7 +158,7 @@ def main():
     print(
         f"📝 Text to speak ({len(text)} characters): {text[:100]}{'...' if len(text) > 100 else ''}"
     )
-    speak(text, engine, voice)
+    speak(text, engine, voice, speech)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,19 @@
+"""Constants and helpers shared by the TTS script commands."""
+
+import subprocess
+
+from clipboard import get_clipboard_text as read_clipboard
+
+TTS_MODEL = "gpt-4o-mini-tts"
+
+
+def get_clipboard_text() -> str:
+    """Get text from clipboard."""
+    try:
+        return read_clipboard().strip()
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Failed to get clipboard content: {e}")
+        return ""
+    except Exception as e:
+        print(f"❌ Unexpected error getting clipboard: {e}")
+        return ""